@@ -1,136 +1,166 @@
 import csv
-import sys
+import math
 import statistics
-from datetime import datetime
-from functools import reduce
+from collections import Counter
+from datetime import date
+from functools import lru_cache, reduce
+from operator import add, itemgetter
 # --- CONFIGURATION ---
-# CRITICAL: Increase recursion limit to handle 10,000 rows
-sys.setrecursionlimit(20000)
-
 INPUT_FILE = 'datasets/dirty_cafe_sales.csv'
 OUTPUT_FILE = 'datasets/functional_pure_output.csv'
 DECIMAL_PLACES = 2
+CENTS = 10 ** DECIMAL_PLACES # Money is multiplied in integer cents
+# Placeholder strings that mark a missing/dirty cell
+_DIRTY = frozenset(("ERROR", "UNKNOWN", ""))
 
 def read_csv(file_path):
     """Reads a CSV file and returns its contents as a list of dictionaries."""
     with open(file_path, mode='r', newline='', encoding='utf-8') as csvfile:
-        return list(csv.DictReader(csvfile))
+        # csv.reader + zip builds each row dict in C, unlike DictReader's Python-level __next__
+        reader = csv.reader(csvfile)
+        header = next(reader, [])
+        return [to_row(file_path, header, row_number, values) for row_number, values in enumerate(reader, start=1) if values]
+
+def to_row(file_path, header, row_number, values):
+    """Pairs a record with the header, rejecting ragged rows that zip() would silently truncate."""
+    if len(values) != len(header):
+        raise ValueError(f"Data row {row_number} of '{file_path}' has {len(values)} fields, expected {len(header)}.")
+    return dict(zip(header, values))
 
 def save_to_csv(file_path, data):
     """Saves a list of dictionaries to a CSV file."""
     if not data:
         return
-    keys = data[0].keys()
+    keys = list(data[0].keys())
     try:
         with open(file_path, mode='w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=keys)
-            writer.writeheader()
-            writer.writerows(data)
+            writer = csv.writer(csvfile)
+            writer.writerow(keys)
+            # itemgetter pulls each row's fields in C, skipping DictWriter's per-row key checks
+            writer.writerows(map(itemgetter(*keys), data))
     except PermissionError:
         print(f"\n[ERROR] Could not save to '{file_path}'.")
         print("Is the file open in Excel? Please close it and try again.")
     except Exception as e:
         print(f"\n[ERROR] An unexpected error occurred: {e}")
 
+# The columns hold only a few dozen distinct numeric strings, so the
+# conversions are memoized on the raw string (the default is applied outside)
+@lru_cache(maxsize=1024)
+def _parse_float_value(value: str) -> float:
+    return round(float(value), DECIMAL_PLACES)
+
+@lru_cache(maxsize=1024)
+def _parse_int_value(value: str) -> int:
+    return int(value)
+
 def parse_float(value: str, default: float) -> float:
     """
-    Uses Pattern Matching to handle dirty data strings.
+    Replaces dirty data strings with the default via a frozenset lookup.
     """
     try:
-        match value:
-            case "ERROR" | "UNKNOWN" | "": 
-                return round(float(default), DECIMAL_PLACES)
-            case _: 
-                return round(float(value), DECIMAL_PLACES)
+        return round(float(default), DECIMAL_PLACES) if value in _DIRTY else _parse_float_value(value)
     except ValueError:
         raise ValueError(f"Cannot convert {value} to float.")
 
 def parse_int(value: str, default: int) -> int:
     """
-    Uses Pattern Matching to handle dirty data strings.
+    Replaces dirty data strings with the default via a frozenset lookup.
     """
     try:
-        match value:
-            case "ERROR" | "UNKNOWN" | "": 
-                return default
-            case _: 
-                return int(value)
+        return default if value in _DIRTY else _parse_int_value(value)
     except ValueError:
         raise ValueError(f"Cannot convert {value} to int.")
     
 def parse_date(value: str, default: str) -> str:
     try:
-        match value:
-            case "ERROR" | "UNKNOWN" | "":
-                return default
-            case _:
-                datetime.strptime(value, '%Y-%m-%d')
-                return value
+        if value in _DIRTY:
+            return default
+        # Layout check + date.fromisoformat validates YYYY-MM-DD far cheaper than strptime.
+        # Only zero-padded dates are accepted: '2023-1-5' (which strptime allowed) is rejected.
+        if len(value) != 10 or value[4] != '-' or value[7] != '-':
+            raise ValueError
+        date.fromisoformat(value)
+        return value
     except ValueError:
         raise ValueError(f"Cannot parse date from {value}.")
 
 def parse_string(value: str, default: str) -> str:
-    match value:
-        case "ERROR" | "UNKNOWN" | "":
-            return default
-        case _:
-            return value
+    return default if value in _DIRTY else value
 
 def get_column(data, column_name, accumulator):
-    match data:
-        case []:
-            return accumulator
-        case [head, *tail]:
-            match head[column_name]:
-                case "ERROR" | "UNKNOWN" | "":
-                    return get_column(tail, column_name, accumulator)
-                case _:
-                    return get_column(tail, column_name, accumulator + [head[column_name]])
-        
-def clean_row(row, defults):
-    quantity = parse_int(row['Quantity'], defults['defult_quantity_median']) 
-    price_per_unit = parse_float(row['Price Per Unit'], defults['defult_price_per_unit_mean'])
-    # Compute New Columns
-    corrected_total = quantity * price_per_unit
-    return {
-        **row,
-        'Item': parse_string(row['Item'], defults['defult_item_mode']), 
-        'Quantity': quantity, 
-        'Price Per Unit': price_per_unit, 
-        'Total Spent': parse_float(row['Total Spent'], 0.0), # keep 0.0 as it will be recomputed
-        'Payment Method': parse_string(row['Payment Method'], defults['defult_payment_method_mode']), 
-        'Location': parse_string(row['Location'], defults['defult_location_mode']), 
-        'Transaction Date': parse_date(row['Transaction Date'], defults['defult_transaction_date_mode']), 
-        'Corrected Total': round(float(corrected_total), DECIMAL_PLACES)
-    }
-
-# Filter rows based on conditions (Data Transformation)
-def filter_by_column_and_value(row, column_name, value):
-    return row[column_name] == value
+    """
+    Collects the clean values of a column in a single pass.
+    A comprehension replaces the former tail recursion, so no recursion limit is needed.
+    """
+    return accumulator + [row[column_name] for row in data if row[column_name] not in _DIRTY]
 
-# Aggregate Data (Data Transformation)
+def collect_columns(data, column_names):
+    """
+    Collects the clean values of several columns, keyed by column name.
+    Each column is one get_column comprehension pass over the rows (not a fused single pass).
+    """
+    return {column_name: get_column(data, column_name, []) for column_name in column_names}
+        
+def make_row_cleaner(defults):
+    """
+    Returns a clean_row function specialized for the given defaults.
+    The defaults are resolved once and captured in the closure, and the cleaned
+    row is built directly instead of copying every field with {**row, ...}.
+    """
+    quantity_default = defults['defult_quantity_median']
+    price_per_unit_default = defults['defult_price_per_unit_mean'] # parse_float rounds it
+    item_default = defults['defult_item_mode']
+    payment_method_default = defults['defult_payment_method_mode']
+    location_default = defults['defult_location_mode']
+    transaction_date_default = defults['defult_transaction_date_mode']
+
+    def clean_row(row):
+        quantity = parse_int(row['Quantity'], quantity_default) 
+        price_per_unit = parse_float(row['Price Per Unit'], price_per_unit_default)
+        # Compute New Columns
+        # Quantities are ints and prices are rounded to DECIMAL_PLACES, so the product is exact in whole cents
+        corrected_total = quantity * round(price_per_unit * CENTS) / CENTS
+        return {
+            'Transaction ID': row['Transaction ID'],
+            'Item': parse_string(row['Item'], item_default), 
+            'Quantity': quantity, 
+            'Price Per Unit': price_per_unit, 
+            'Total Spent': parse_float(row['Total Spent'], 0.0), # keep 0.0 as it will be recomputed
+            'Payment Method': parse_string(row['Payment Method'], payment_method_default), 
+            'Location': parse_string(row['Location'], location_default), 
+            'Transaction Date': parse_date(row['Transaction Date'], transaction_date_default), 
+            'Corrected Total': corrected_total
+        }
+
+    return clean_row
+
+# Filter + Aggregate Data (Data Transformation)
 def get_aggregate_by_coloumn_for_item(data, item_name, column_name, operation):
-    item_data_iter = filter(lambda row: filter_by_column_and_value(row, 'Item', item_name), data)
-    final_item_list = list(item_data_iter)
-    corected_totals_item = get_column(final_item_list, column_name, [])
-    return reduce(operation, corected_totals_item, 0.0)
+    # The generator fuses filter and column extraction, so reduce folds the
+    # matching values in one pass without building intermediate lists
+    item_values = (row[column_name] for row in data if row['Item'] == item_name)
+    return reduce(operation, item_values, 0.0)
 
 # Data Analysis & Statistical Summaries
 def print_numeric_analysis(final_data, column_name, label):
-    # Use map() to extract column efficiently (Faster than recursive get_column)
+    # Use map() to extract the column in one pass
     values = list(map(lambda row: row[column_name], final_data))
+    # fmean + one fsum of squared deviations avoid statistics' exact Fraction arithmetic
+    mean = statistics.fmean(values)
+    if len(values) < 2: # Same error statistics.variance raises for a single value
+        raise statistics.StatisticsError('variance requires at least two data points')
+    variance = math.fsum(map(lambda value: (value - mean) ** 2, values)) / (len(values) - 1)
     print(f"\n--- Analysis: {label} ---")
-    print(f"Mean:     {statistics.mean(values):.2f}")
+    print(f"Mean:     {mean:.2f}")
     print(f"Median:   {statistics.median(values):.2f}")
-    print(f"Variance: {statistics.variance(values):.2f}")
+    print(f"Variance: {variance:.2f}")
 
 def print_categorical_analysis(final_data, column_name, label):
     values = list(map(lambda row: row[column_name], final_data))
     print(f"\n--- Trend: {label} ---")
-    try:
-        print(f"Most Common (Mode): {statistics.mode(values)}")
-    except statistics.StatisticsError:
-        print(f"Most Common (Mode): Multiple found")
+    # most_common keeps statistics.mode's first-seen tie breaking
+    print(f"Most Common (Mode): {Counter(values).most_common(1)[0][0]}")
 
 def main():
     print("--- Starting Pure Functional Pipeline ---")
@@ -139,25 +169,19 @@ def main():
     raw_data = read_csv(INPUT_FILE)
 
     # Compute Defults
-    list_quantity_defaults = get_column(raw_data, 'Quantity', [])
-    quantity_values_defaults = list(map(lambda x: parse_int(x, 0), list_quantity_defaults))
-    quantity_median_defaults = statistics.median(quantity_values_defaults)
+    default_columns = collect_columns(raw_data, ('Quantity', 'Price Per Unit', 'Item', 'Payment Method', 'Location', 'Transaction Date'))
+
+    quantity_values_defaults = list(map(lambda x: parse_int(x, 0), default_columns['Quantity']))
+    # median_low always returns an actual quantity, so the default stays an int
+    quantity_median_defaults = statistics.median_low(quantity_values_defaults)
 
-    list_price_per_unit_defaults = get_column(raw_data, 'Price Per Unit', [])
-    price_per_unit_values_defaults = list(map(lambda x: parse_float(x, 0.0), list_price_per_unit_defaults))
+    price_per_unit_values_defaults = list(map(lambda x: parse_float(x, 0.0), default_columns['Price Per Unit']))
     price_per_unit_mean_defaults = statistics.mean(price_per_unit_values_defaults)
     
-    list_item_defaults = get_column(raw_data, 'Item', [])
-    item_mode_defaults = statistics.mode(list_item_defaults)
-
-    list_payment_method_defaults = get_column(raw_data, 'Payment Method', [])
-    payment_method_mode_defaults = statistics.mode(list_payment_method_defaults)
-
-    list_location_defaults = get_column(raw_data, 'Location', [])
-    location_mode_defaults = statistics.mode(list_location_defaults)
-
-    list_transaction_date_defaults = get_column(raw_data, 'Transaction Date', [])
-    transaction_date_mode_defaults = statistics.mode(list_transaction_date_defaults)
+    item_mode_defaults = statistics.mode(default_columns['Item'])
+    payment_method_mode_defaults = statistics.mode(default_columns['Payment Method'])
+    location_mode_defaults = statistics.mode(default_columns['Location'])
+    transaction_date_mode_defaults = statistics.mode(default_columns['Transaction Date'])
     
     defults = {
         'defult_quantity_median': quantity_median_defaults,
@@ -168,10 +192,10 @@ def main():
         'defult_transaction_date_mode': transaction_date_mode_defaults
     }
     # Clean Data
-    cleaned_data = map(lambda row: clean_row(row, defults), raw_data)
+    cleaned_data = map(make_row_cleaner(defults), raw_data)
     full_cleaned_data = list(cleaned_data)
     # Example Total spent on Coffee (Data Transformation)
-    total_spent_coffee = get_aggregate_by_coloumn_for_item(full_cleaned_data, 'Coffee', 'Corrected Total', lambda x, y: x + y)
+    total_spent_coffee = get_aggregate_by_coloumn_for_item(full_cleaned_data, 'Coffee', 'Corrected Total', add)
     print("\n--- Total Spent on Coffee ---")
     print(f"total:     {total_spent_coffee}")
     
@@ -1,7 +1,10 @@
 import csv
+import io
 import sys
 import statistics
-from datetime import datetime
+from collections import Counter
+from datetime import date
+from functools import lru_cache
 
 # --- CONFIGURATION ---
 # The recursion limit is no longer relevant in the imperative version
@@ -11,31 +14,72 @@ from datetime import datetime
 INPUT_FILE = 'datasets/dirty_cafe_sales.csv'
 OUTPUT_FILE = 'datasets/imperative_output.csv' 
 DECIMAL_PLACES = 2
+CENTS = 10 ** DECIMAL_PLACES # Money is multiplied in integer cents
+IO_BUFFER_SIZE = 1 << 20
+# Placeholder strings that mark a missing/dirty cell
+_DIRTY = frozenset(("ERROR", "UNKNOWN", ""))
 
 # --- I/O FUNCTIONS (Remain largely the same, as they are I/O bound) ---
+# The table is held column-wise (struct of arrays): one list per CSV column,
+# keyed by the header name, so every stage scans plain lists instead of row dicts.
 def read_csv(file_path):
-    """Reads a CSV file and returns its contents as a list of dictionaries."""
+    """
+    Reads a CSV file and returns its contents as a dictionary of column lists.
+    Files without any quote character are split with str.split(','), which is much
+    cheaper than the csv state machine but only valid for flat (unquoted) CSVs;
+    anything containing '"' (or bare '\r' line endings) goes through csv.reader instead.
+    """
     print(f"Reading data from: {file_path}")
     try:
         with open(file_path, mode='r', newline='', encoding='utf-8') as csvfile:
-            # Note: list(csv.DictReader(csvfile)) is already an imperative, simple list creation
-            return list(csv.DictReader(csvfile))
+            text = csvfile.read()
     except FileNotFoundError:
         print(f"[ERROR] Input file '{file_path}' not found.")
-        return []
+        return {}
+
+    if '"' in text or text.count('\r') != text.count('\r\n'):
+        # Quoted fields may hold commas or line breaks, and bare '\r' ends a record
+        # for csv.reader too, so use the full csv parser
+        reader = csv.reader(io.StringIO(text, newline=''))
+    else:
+        # Split on real record endings only ('\n' / '\r\n'), like csv.reader with
+        # newline=''; str.splitlines would also break on \x0b, \x85, \u2028, ...
+        reader = (line.split(',') if line else [] for line in text.replace('\r\n', '\n').split('\n'))
+
+    header = next(reader, [])
+    columns = {}
+    appenders = [] # Bound list.append methods, looked up once instead of per cell
+    for column_name in header:
+        columns[column_name] = []
+        appenders.append(columns[column_name].append)
+    for row_number, values in enumerate(reader, start=1):
+        if not values: # Skip blank lines, as DictReader does
+            continue
+        # zip() would silently truncate a ragged row and shift the columns out of step
+        if len(values) != len(header):
+            raise ValueError(f"Data row {row_number} of '{file_path}' has {len(values)} fields, expected {len(header)}.")
+        for append, value in zip(appenders, values):
+            append(value)
+    return columns
 
 def save_to_csv(file_path, data):
-    """Saves a list of dictionaries to a CSV file."""
-    if not data:
+    """Saves a dictionary of column lists to a CSV file."""
+    if not any(data.values()):
         print("[WARNING] No data to save.")
         return
-    keys = data[0].keys()
+    # zip(*columns) below would silently drop rows if the columns were out of step
+    row_count = len(next(iter(data.values())))
+    for column_name, values in data.items():
+        if len(values) != row_count:
+            print(f"\n[ERROR] Column '{column_name}' has {len(values)} values, expected {row_count}. Nothing saved.")
+            return
     print(f"Saving cleaned data to: {file_path}")
     try:
-        with open(file_path, mode='w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=keys)
-            writer.writeheader()
-            writer.writerows(data)
+        with open(file_path, mode='w', newline='', encoding='utf-8', buffering=IO_BUFFER_SIZE) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(data.keys())
+            # zip() walks the columns in lockstep, yielding one output row at a time
+            writer.writerows(zip(*data.values()))
     except PermissionError:
         print(f"\n[ERROR] Could not save to '{file_path}'.")
         print("Is the file open in Excel? Please close it and try again.")
@@ -47,13 +91,23 @@ def save_to_csv(file_path, data):
 # We'll keep the core parsing functions for consistency, but remove
 # pattern matching (case) for a more typical imperative approach (if/elif/else).
 
+# Numeric columns repeat a few dozen distinct strings, so the conversion of the
+# raw string is memoized; the varying default stays outside the cache key.
+@lru_cache(maxsize=1024)
+def _parse_float_value(value: str) -> float:
+    return round(float(value), DECIMAL_PLACES)
+
+@lru_cache(maxsize=1024)
+def _parse_int_value(value: str) -> int:
+    return int(value)
+
 def parse_float(value: str, default: float) -> float:
     """Handles dirty data strings for floats using explicit if/else."""
     try:
-        if value in ["ERROR", "UNKNOWN", ""]:
+        if value in _DIRTY:
             return round(float(default), DECIMAL_PLACES)
         else:
-            return round(float(value), DECIMAL_PLACES)
+            return _parse_float_value(value)
     except ValueError:
         # In a robust system, you might log this instead of raising
         raise ValueError(f"Cannot convert {value} to float.")
@@ -61,113 +115,153 @@ def parse_float(value: str, default: float) -> float:
 def parse_int(value: str, default: int) -> int:
     """Handles dirty data strings for integers using explicit if/else."""
     try:
-        if value in ["ERROR", "UNKNOWN", ""]:
+        if value in _DIRTY:
             return default
         else:
-            return int(value)
+            return _parse_int_value(value)
     except ValueError:
         raise ValueError(f"Cannot convert {value} to int.")
         
 def parse_date(value: str, default: str) -> str:
     """Handles dirty data strings for dates using explicit if/else."""
     try:
-        if value in ["ERROR", "UNKNOWN", ""]:
+        if value in _DIRTY:
             return default
         else:
-            # Check for valid date format
-            datetime.strptime(value, '%Y-%m-%d')
+            # Check for valid YYYY-MM-DD format: a layout check plus the C-level
+            # date.fromisoformat is far cheaper than datetime.strptime. Only zero-padded
+            # dates are accepted: '2023-1-5' (which strptime allowed) is rejected.
+            if len(value) != 10 or value[4] != '-' or value[7] != '-':
+                raise ValueError
+            date.fromisoformat(value)
             return value
     except ValueError:
         raise ValueError(f"Cannot parse date from {value}.")
 
-def parse_string(value: str, default: str) -> str:
-    """Handles dirty data strings for strings using explicit if/else."""
-    if value in ["ERROR", "UNKNOWN", ""]:
-        return default
-    else:
-        return value
-
 # --- CORE IMPERATIVE DATA PROCESSING ---
 
+def fill_dirty_values(values, default):
+    """
+    Replaces dirty data strings in a column list with the default (a column-wise fillna).
+    The check is inlined in one loop instead of a parse call per value.
+    """
+    filled = []
+    for value in values:
+        if value in _DIRTY:
+            filled.append(default)
+        else:
+            filled.append(value)
+    return filled
+
 def compute_column_stats(data):
     """
     Computes statistical defaults (median, mean, mode) for cleaning in an imperative style.
     This replaces the recursive get_column and subsequent map/statistics calls in the main.
+    Each required column is scanned once as a plain list.
     """
-    # 1. Collect all non-dirty values for required columns in lists
+    # 1. Accumulate all non-dirty values for required columns
     quantities = []
-    prices_per_unit = []
-    items = []
-    payment_methods = []
-    locations = []
-    transaction_dates = []
+    price_sum = 0.0 # Running sum/count replace the prices list for the mean
+    price_count = 0
+    items = Counter()
+    payment_methods = Counter()
+    locations = Counter()
+    transaction_dates = Counter()
 
-    for row in data:
-        # Quantity (Need to parse to int first)
-        if row['Quantity'] not in ["ERROR", "UNKNOWN", ""]:
+    # Quantity (Need to parse to int first)
+    for value in data['Quantity']:
+        if value not in _DIRTY:
             try:
-                quantities.append(int(row['Quantity']))
+                quantities.append(int(value))
             except ValueError:
                 pass # Skip unparseable values
 
-        # Price Per Unit (Need to parse to float first)
-        if row['Price Per Unit'] not in ["ERROR", "UNKNOWN", ""]:
+    # Price Per Unit (Need to parse to float first)
+    for value in data['Price Per Unit']:
+        if value not in _DIRTY:
             try:
-                prices_per_unit.append(float(row['Price Per Unit']))
+                price_sum += float(value)
+                price_count += 1
             except ValueError:
                 pass # Skip unparseable values
 
-        # Categorical Columns (Simple non-empty check)
-        if row['Item'] not in ["ERROR", "UNKNOWN", ""]:
-            items.append(row['Item'])
-        if row['Payment Method'] not in ["ERROR", "UNKNOWN", ""]:
-            payment_methods.append(row['Payment Method'])
-        if row['Location'] not in ["ERROR", "UNKNOWN", ""]:
-            locations.append(row['Location'])
-        if row['Transaction Date'] not in ["ERROR", "UNKNOWN", ""]:
+    # Categorical Columns (Simple non-empty check, counted as we go)
+    for value in data['Item']:
+        if value not in _DIRTY:
+            items[value] += 1
+    for value in data['Payment Method']:
+        if value not in _DIRTY:
+            payment_methods[value] += 1
+    for value in data['Location']:
+        if value not in _DIRTY:
+            locations[value] += 1
+    for value in data['Transaction Date']:
+        if value not in _DIRTY:
             # Optionally check date format validity here, but for mode, raw string is okay
-            transaction_dates.append(row['Transaction Date'])
+            transaction_dates[value] += 1
     
-    # 2. Compute the defaults (Imperative use of statistics module)
+    # 2. Compute the defaults (most_common keeps statistics.mode's first-seen tie breaking)
     defults = {
-        'defult_quantity_median': statistics.median(quantities) if quantities else 0,
-        'defult_price_per_unit_mean': statistics.mean(prices_per_unit) if prices_per_unit else 0.0,
-        'defult_item_mode': statistics.mode(items) if items else 'UNKNOWN',
-        'defult_payment_method_mode': statistics.mode(payment_methods) if payment_methods else 'UNKNOWN',
-        'defult_location_mode': statistics.mode(locations) if locations else 'UNKNOWN',
-        'defult_transaction_date_mode': statistics.mode(transaction_dates) if transaction_dates else '1970-01-01'
+        # median_low always returns an actual quantity, so the default stays an int
+        'defult_quantity_median': statistics.median_low(quantities) if quantities else 0,
+        'defult_price_per_unit_mean': price_sum / price_count if price_count else 0.0,
+        'defult_item_mode': items.most_common(1)[0][0] if items else 'UNKNOWN',
+        'defult_payment_method_mode': payment_methods.most_common(1)[0][0] if payment_methods else 'UNKNOWN',
+        'defult_location_mode': locations.most_common(1)[0][0] if locations else 'UNKNOWN',
+        'defult_transaction_date_mode': transaction_dates.most_common(1)[0][0] if transaction_dates else '1970-01-01'
     }
     return defults
 
 def clean_data_imperative(raw_data, defults):
     """
-    Cleans and transforms data by modifying the list of dictionaries directly (in-place modification 
-    or building a new list with explicit loops), which is a characteristic of imperative style.
+    Cleans and transforms data by building new column lists with explicit loops,
+    which is a characteristic of imperative style.
     """
-    cleaned_data = [] # We build a new list to avoid modifying the input list in-place
-    
-    # Explicit loop replacing the map() function
-    for row in raw_data:
-        # Apply cleaning and parsing for each field
-        quantity = parse_int(row['Quantity'], defults['defult_quantity_median'])
-        price_per_unit = parse_float(row['Price Per Unit'], defults['defult_price_per_unit_mean'])
-        
-        # Compute New Columns
-        corrected_total = quantity * price_per_unit
-        
-        # Build the new, cleaned row dictionary
-        cleaned_row = {
-            **row,
-            'Item': parse_string(row['Item'], defults['defult_item_mode']),
-            'Quantity': quantity,
-            'Price Per Unit': price_per_unit,
-            'Total Spent': parse_float(row['Total Spent'], 0.0), # keep 0.0 as it will be recomputed (0.0 is safe default)
-            'Payment Method': parse_string(row['Payment Method'], defults['defult_payment_method_mode']),
-            'Location': parse_string(row['Location'], defults['defult_location_mode']),
-            'Transaction Date': parse_date(row['Transaction Date'], defults['defult_transaction_date_mode']),
-            'Corrected Total': round(float(corrected_total), DECIMAL_PLACES)
-        }
-        cleaned_data.append(cleaned_row)
+    # We build new column lists to avoid modifying the input columns in-place;
+    # untouched columns (e.g. Transaction ID) are shared with raw_data.
+    cleaned_data = dict(raw_data)
+
+    # Resolve the fill values once (like a column-wise fillna) instead of
+    # looking them up in the defaults dict for every value
+    quantity_default = defults['defult_quantity_median']
+    price_per_unit_default = defults['defult_price_per_unit_mean'] # parse_float rounds it
+    item_default = defults['defult_item_mode']
+    payment_method_default = defults['defult_payment_method_mode']
+    location_default = defults['defult_location_mode']
+    transaction_date_default = defults['defult_transaction_date_mode']
+
+    # Categorical columns only need their dirty values filled with the mode
+    cleaned_data['Item'] = fill_dirty_values(raw_data['Item'], item_default)
+    cleaned_data['Payment Method'] = fill_dirty_values(raw_data['Payment Method'], payment_method_default)
+    cleaned_data['Location'] = fill_dirty_values(raw_data['Location'], location_default)
+
+    # Explicit loops replacing the map() function, one per parsed column
+    quantities = []
+    for value in raw_data['Quantity']:
+        quantities.append(parse_int(value, quantity_default))
+    cleaned_data['Quantity'] = quantities
+
+    prices_per_unit = []
+    for value in raw_data['Price Per Unit']:
+        prices_per_unit.append(parse_float(value, price_per_unit_default))
+    cleaned_data['Price Per Unit'] = prices_per_unit
+
+    totals_spent = []
+    for value in raw_data['Total Spent']:
+        totals_spent.append(parse_float(value, 0.0)) # keep 0.0 as it will be recomputed (0.0 is safe default)
+    cleaned_data['Total Spent'] = totals_spent
+
+    transaction_dates = []
+    for value in raw_data['Transaction Date']:
+        transaction_dates.append(parse_date(value, transaction_date_default))
+    cleaned_data['Transaction Date'] = transaction_dates
+
+    # Compute New Columns
+    corrected_totals = []
+    for quantity, price_per_unit in zip(quantities, prices_per_unit):
+        # Quantities are ints and prices are rounded to DECIMAL_PLACES, so the product is exact in whole cents
+        corrected_totals.append(quantity * round(price_per_unit * CENTS) / CENTS)
+    cleaned_data['Corrected Total'] = corrected_totals
         
     return cleaned_data
 
@@ -178,49 +272,51 @@ def get_aggregate_total_spent(data, item_name, column_name):
     """
     total = 0.0 # Accumulator variable
     # Explicit loop replacing filter and reduce
-    for row in data:
-        if row['Item'] == item_name:
+    for item, value in zip(data['Item'], data[column_name]):
+        if item == item_name:
             # We assume the data is already cleaned and the column value is a number
-            total += row[column_name] 
+            total += value
     
     return total
 
-# --- ANALYSIS FUNCTIONS (Using explicit loop to extract data) ---
+# --- ANALYSIS FUNCTIONS (Columns are already plain lists, no extraction loop needed) ---
 
 def print_numeric_analysis(data, column_name, label):
-    """Calculates and prints numeric stats using an imperative loop for data extraction."""
-    values = []
-    # Explicit loop replacing the map() function
-    for row in data:
-        # We assume the data is cleaned and the column value is a number
-        values.append(row[column_name])
+    """Calculates and prints numeric stats for a column list."""
+    # We assume the data is cleaned and the column values are numbers
+    values = data[column_name]
         
     if not values:
         print(f"\n--- Analysis: {label} ---")
         print("No valid numeric data found.")
         return
+
+    # Sample variance from one loop around the float mean, instead of
+    # statistics.mean/variance which sum exact Fractions
+    mean = statistics.fmean(values)
+    squared_deviations = 0.0
+    for value in values:
+        squared_deviations += (value - mean) ** 2
+    if len(values) < 2: # Same error statistics.variance raises for a single value
+        raise statistics.StatisticsError('variance requires at least two data points')
+    variance = squared_deviations / (len(values) - 1)
         
     print(f"\n--- Analysis: {label} ---")
-    print(f"Mean:       {statistics.mean(values):.2f}")
+    print(f"Mean:       {mean:.2f}")
     print(f"Median:     {statistics.median(values):.2f}")
-    print(f"Variance:   {statistics.variance(values):.2f}")
+    print(f"Variance:   {variance:.2f}")
 
 def print_categorical_analysis(data, column_name, label):
-    """Finds and prints the mode for a categorical column using an imperative loop."""
-    values = []
-    # Explicit loop replacing the map() function
-    for row in data:
-        values.append(row[column_name])
+    """Finds and prints the mode for a categorical column list."""
+    values = data[column_name]
         
     print(f"\n--- Trend: {label} ---")
     if not values:
         print("Most Common (Mode): No data found")
         return
 
-    try:
-        print(f"Most Common (Mode): {statistics.mode(values)}")
-    except statistics.StatisticsError:
-        print(f"Most Common (Mode): Multiple found")
+    # most_common keeps statistics.mode's first-seen tie breaking
+    print(f"Most Common (Mode): {Counter(values).most_common(1)[0][0]}")
 
 # --- MAIN EXECUTION BLOCK ---
 
@@ -229,7 +325,7 @@ def main_imperative():
     
     # 1. Load Data (IO is isolated)
     raw_data = read_csv(INPUT_FILE)
-    if not raw_data:
+    if not any(raw_data.values()):
         return
         
     # 2. Compute Defaults (Using imperative, loop-based function)